@@ -1,34 +1,195 @@
 import gradio as gr
 import os
+import atexit
+import functools
+import gzip
+import re
+import random
+import asyncio
+import aiohttp
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import time
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
+import numpy as np
+from cachetools import TTLCache
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer, UnicodeDammit
+from selectolax.lexbor import LexborHTMLParser
 import google.generativeai as genai
-from typing import Optional, List, Dict
+from google.api_core.exceptions import ResourceExhausted
+from typing import Optional, List, Dict, Tuple, NamedTuple
 
 # Load environment variables
 load_dotenv(override=True)
 api_key = os.getenv('GEMINI_API_KEY')
 
 # Configure Gemini API
+MODEL_NAME = 'models/gemini-2.5-flash-lite'
 if api_key:
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('models/gemini-2.5-flash-lite')
+    model = genai.GenerativeModel(MODEL_NAME)
 else:
     model = None
 
+# Sampling settings for summaries
+GENERATION_CONFIG = {"temperature": 0.2}
+
+# Upper bound on Gemini requests in flight across all users, to stay within the QPM quota
+GEMINI_MAX_CONCURRENT_REQUESTS = 8
+gemini_semaphore = threading.BoundedSemaphore(GEMINI_MAX_CONCURRENT_REQUESTS)
+
+# Retries with exponential backoff when Gemini reports the quota is exhausted
+GEMINI_MAX_RETRIES = 4
+GEMINI_INITIAL_BACKOFF = 1.0
+
+# One model per summary type, with its system prompt set as system_instruction
+summary_models: Dict[str, genai.GenerativeModel] = {}
+summary_models_lock = threading.Lock()
+
 # Global storage for summaries
 summaries_history = []
-SUMMARIES_FILE = "summaries_history.json"
+summaries_loaded = False
+summaries_load_lock = threading.Lock()
+SUMMARIES_FILE = "summaries_history.jsonl"
+LEGACY_SUMMARIES_FILE = "summaries_history.json"
+# Histories larger than this are kept gzip-compressed
+GZIP_SUMMARIES_FILE = SUMMARIES_FILE + ".gz"
+GZIP_THRESHOLD = 1000
+
+# Append-only handle to SUMMARIES_FILE, opened on first save
+summaries_file = None
+summaries_file_lock = threading.Lock()
+
+# In-memory cache of successful summaries keyed by (url, summary_type)
+summary_cache = TTLCache(maxsize=512, ttl=3600)
+summary_cache_lock = threading.Lock()
+
+# Semantic cache: reuse summaries of near-identical pages (mirrors, syndicated articles)
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Stored with each embedding; entries embedded differently are not used for matching
+EMBEDDING_VERSION = "all-MiniLM-L6-v2/chunk-mean"
+# The model truncates at 256 word pieces, so longer text is embedded in chunks and averaged
+EMBEDDING_CHUNK_CHARS = 1000
+SEMANTIC_SIMILARITY_THRESHOLD = 0.92
+embedder = None
+# Set once loading the embedding model fails; the semantic cache then stays off for this process
+embedder_unavailable = False
+embedder_lock = threading.Lock()
+# summary_type -> embeddings of summarized pages and their summaries
+semantic_index: Dict[str, "SemanticIndex"] = {}
+semantic_index_lock = threading.Lock()
 
 # Headers for web scraping
 headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
 }
 
+# Shared HTTP session so connections are pooled and reused between requests
+session = requests.Session()
+session.headers.update(headers)
+adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=2, backoff_factor=0.3))
+session.mount("https://", adapter)
+session.mount("http://", adapter)
+
+# Only build tree nodes for the parts of a page we actually read
+ONLY_TITLE_AND_BODY = SoupStrainer(["title", "body"])
+
+# Elements that never contribute useful text to a summary
+IRRELEVANT_TAGS = frozenset({"script", "style", "noscript", "img", "input", "svg", "iframe"})
+IRRELEVANT_SELECTOR = ", ".join(sorted(IRRELEVANT_TAGS))
+
+# Runs of whitespace, collapsed to a single space in titles
+WHITESPACE_RE = re.compile(r"\s+")
+
+# Maximum characters of page text sent to Gemini
+MAX_TEXT_CHARS = 8000
+
+# Maximum number of pages fetched at once in batch mode
+MAX_CONCURRENT_FETCHES = 20
+
+# Pages summarized together in one Gemini call in batch mode, and the separator between their sections
+BATCH_GROUP_SIZE = 4
+GROUP_SEPARATOR = "\n---\n"
+
+def _collect_text(strings) -> str:
+    """Join stripped text fragments, stopping once we have enough for the prompt"""
+    chunks = []
+    total = 0
+    for string in strings:
+        chunks.append(string)
+        total += len(string) + 1
+        if total >= MAX_TEXT_CHARS:
+            break
+    return "\n".join(chunks)
+
+def _clean_title(title: str) -> str:
+    """Collapse whitespace in a page title"""
+    return WHITESPACE_RE.sub(" ", title).strip() or "No title found"
+
+def _decode_html(html: bytes, charset: Optional[str] = None) -> str:
+    """Decode raw HTML using the HTTP charset, then the page's own declaration"""
+    # UnicodeDammit tries the HTTP charset, a BOM, <meta charset>, then falls back to guessing
+    dammit = UnicodeDammit(html, known_definite_encodings=[charset] if charset else [], is_html=True)
+    if dammit.unicode_markup is None:
+        return html.decode("utf-8", errors="replace")
+    return dammit.unicode_markup
+
+def _parse(html: bytes, charset: Optional[str] = None) -> Tuple[str, str]:
+    """Extract the title and visible text from raw HTML"""
+    markup = _decode_html(html, charset)
+    try:
+        return _parse_with_lexbor(markup)
+    except Exception:
+        # Fall back to BeautifulSoup for documents lexbor cannot handle
+        return _parse_with_bs4(markup)
+
+def _parse_with_lexbor(html: str) -> Tuple[str, str]:
+    """Extract the title and visible text using selectolax's lexbor parser"""
+    tree = LexborHTMLParser(html)
+    title_node = tree.css_first("title")
+    title = _clean_title(title_node.text() if title_node else "")
+
+    body = tree.body
+    if body is None:
+        return title, ""
+
+    # Remove script, style and other non-text elements
+    for irrelevant in body.css(IRRELEVANT_SELECTOR):
+        irrelevant.decompose()
+
+    # Walk text nodes lazily so _collect_text can stop once we have enough
+    stripped_strings = (
+        node.text(deep=False).strip()
+        for node in body.traverse(include_text=True)
+        if node.tag == "-text"
+    )
+    return title, _collect_text(string for string in stripped_strings if string)
+
+def _parse_with_bs4(html: str) -> Tuple[str, str]:
+    """Extract the title and visible text using BeautifulSoup"""
+    try:
+        soup = BeautifulSoup(html, 'lxml', parse_only=ONLY_TITLE_AND_BODY)
+    except FeatureNotFound:
+        # lxml is not installed, fall back to the pure-Python parser
+        soup = BeautifulSoup(html, 'html.parser', parse_only=ONLY_TITLE_AND_BODY)
+    # The strainer leaves <title> at the top level, so a shallow search usually finds it
+    title_tag = soup.find("title", recursive=False) or soup.title
+    title = _clean_title(title_tag.get_text() if title_tag else "")
+
+    if not soup.body:
+        return title, ""
+
+    # Remove script, style and other non-text elements
+    for irrelevant in soup.body.find_all(IRRELEVANT_TAGS):
+        irrelevant.decompose()
+
+    # Stop collecting text once we have enough, rather than joining the whole page
+    return title, _collect_text(soup.body.stripped_strings)
+
 class Website:
     """Enhanced website scraper with better error handling"""
 
@@ -37,40 +198,225 @@ class Website:
         self.title = "Unknown Title"
         self.text = ""
         self.error = None
+        self.embedding = None
+        self.reused_from = None
 
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = session.get(url, timeout=10)
             response.raise_for_status()
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            self.title = soup.title.string if soup.title else "No title found"
-
-            # Remove script and style elements
-            for irrelevant in soup.body(["script", "style", "img", "input"]):
-                irrelevant.decompose()
-
-            self.text = soup.body.get_text(separator="\n", strip=True) if soup.body else ""
+            # requests assumes ISO-8859-1 when no charset is sent, so only trust an explicit one
+            content_type = response.headers.get("content-type", "").lower()
+            charset = response.encoding if "charset" in content_type else None
+            self.title, self.text = _parse(response.content, charset)
 
         except requests.exceptions.RequestException as e:
             self.error = f"Failed to fetch website: {str(e)}"
         except Exception as e:
             self.error = f"Error processing website: {str(e)}"
 
+    @classmethod
+    def from_parsed(cls, url: str, title: str, text: str) -> "Website":
+        """Build a Website from an already parsed title and text"""
+        website = cls.__new__(cls)
+        website.url = url
+        website.title = title
+        website.text = text
+        website.error = None
+        website.embedding = None
+        website.reused_from = None
+        return website
+
+    @classmethod
+    def from_error(cls, url: str, error: str) -> "Website":
+        """Build a Website representing a failed fetch"""
+        website = cls.from_parsed(url, "Unknown Title", "")
+        website.error = error
+        return website
+
+async def fetch_website(session: aiohttp.ClientSession, semaphore: asyncio.Semaphore, url: str) -> Website:
+    """Fetch and parse a single website without blocking the event loop"""
+    try:
+        async with semaphore:
+            async with session.get(url) as response:
+                response.raise_for_status()
+                html = await response.read()
+                # Only set when the server sends one; otherwise the page's own declaration is used
+                charset = response.charset
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # aiohttp messages can be just the URL, so always name the error type
+        reason = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        return Website.from_error(url, f"Failed to fetch website: {reason}")
+    except Exception as e:
+        # Malformed URLs can fail before aiohttp wraps the error, e.g. UnicodeError from IDNA
+        return Website.from_error(url, f"Failed to fetch website: {type(e).__name__}: {e}")
+
+    # Parse on a worker thread so other fetches keep running on the loop
+    try:
+        title, text = await asyncio.to_thread(_parse, html, charset)
+    except Exception as e:
+        return Website.from_error(url, f"Error processing website: {str(e)}")
+
+    return Website.from_parsed(url, title, text)
+
+BASE_SYSTEM_PROMPT = "You are an assistant that analyzes the contents of a website and provides a summary, ignoring text that might be navigation related."
+
+# System prompts are static, so build them once per summary type
+SYSTEM_PROMPTS = {
+    "short": BASE_SYSTEM_PROMPT + " Respond with a short summary in markdown.",
+    "detailed": BASE_SYSTEM_PROMPT + " Respond with a detailed summary in markdown, including key points and main topics.",
+    "bullet_points": BASE_SYSTEM_PROMPT + " Respond with a bullet-point summary in markdown, highlighting the main ideas.",
+}
+DEFAULT_SYSTEM_PROMPT = BASE_SYSTEM_PROMPT + " Respond in markdown."
+
 def create_system_prompt(summary_type: str = "short") -> str:
     """Create system prompt based on summary type"""
-    base_prompt = "You are an assistant that analyzes the contents of a website and provides a summary, ignoring text that might be navigation related."
-
-    if summary_type == "short":
-        return base_prompt + " Respond with a short summary in markdown."
-    elif summary_type == "detailed":
-        return base_prompt + " Respond with a detailed summary in markdown, including key points and main topics."
-    elif summary_type == "bullet_points":
-        return base_prompt + " Respond with a bullet-point summary in markdown, highlighting the main ideas."
-    else:
-        return base_prompt + " Respond in markdown."
-
-def summarize_website(url: str, summary_type: str = "short") -> str:
+    return SYSTEM_PROMPTS.get(summary_type, DEFAULT_SYSTEM_PROMPT)
+
+def get_summary_model(summary_type: str = "short") -> genai.GenerativeModel:
+    """Get the Gemini model configured with the system prompt for a summary type"""
+    with summary_models_lock:
+        if summary_type not in summary_models:
+            summary_models[summary_type] = genai.GenerativeModel(
+                MODEL_NAME,
+                system_instruction=create_system_prompt(summary_type)
+            )
+        return summary_models[summary_type]
+
+def generate_with_backoff(summary_model: genai.GenerativeModel, prompt: str):
+    """Call Gemini, backing off exponentially on rate-limit errors"""
+    delay = GEMINI_INITIAL_BACKOFF
+    for attempt in range(GEMINI_MAX_RETRIES + 1):
+        try:
+            with gemini_semaphore:
+                return summary_model.generate_content(prompt, generation_config=GENERATION_CONFIG)
+        except ResourceExhausted:
+            if attempt == GEMINI_MAX_RETRIES:
+                raise
+            time.sleep(delay + random.uniform(0, delay / 2))
+            delay *= 2
+
+class SummaryResult(NamedTuple):
+    """Summary text together with the title of the summarized page"""
+    summary: str
+    title: str
+    embedding: Optional[List[float]] = None
+    # URL whose summary was reused by the semantic cache; such results are not saved
+    reused_from: Optional[str] = None
+
+def embed_text(text: str) -> Optional[np.ndarray]:
+    """Compute a normalized embedding of page text, or None if unavailable"""
+    global embedder, embedder_unavailable
+    with embedder_lock:
+        if embedder_unavailable:
+            return None
+        if embedder is None:
+            try:
+                # Imported lazily so the app starts without loading torch
+                from sentence_transformers import SentenceTransformer
+                embedder = SentenceTransformer(EMBEDDING_MODEL_NAME, device="cpu")
+            except Exception as e:
+                embedder_unavailable = True
+                print(f"Warning: Could not load embedding model, semantic cache disabled: {e}")
+                return None
+
+    try:
+        chunks = [text[i:i + EMBEDDING_CHUNK_CHARS] for i in range(0, len(text), EMBEDDING_CHUNK_CHARS)]
+        embedding = embedder.encode(chunks, normalize_embeddings=True).mean(axis=0)
+        return embedding / np.linalg.norm(embedding)
+    except Exception as e:
+        print(f"Warning: Could not compute embedding: {e}")
+        return None
+
+class SemanticEntry(NamedTuple):
+    """A summary known to the semantic cache and the page it came from"""
+    summary: str
+    title: str
+    url: str
+
+class SemanticIndex:
+    """Normalized page embeddings for one summary type, stored in a growable matrix"""
+
+    def __init__(self, embeddings: np.ndarray, entries: List[SemanticEntry]):
+        self.matrix = embeddings
+        self.size = len(entries)
+        self.entries = entries
+
+    def add(self, embedding: np.ndarray, entry: SemanticEntry):
+        # Double the capacity when full so inserts are amortized O(1)
+        if self.size == len(self.matrix):
+            grown = np.empty((max(16, 2 * len(self.matrix)), self.matrix.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.matrix[:self.size]
+            self.matrix = grown
+        self.matrix[self.size] = embedding
+        self.size += 1
+        self.entries.append(entry)
+
+    def most_similar(self, embedding: np.ndarray, exclude_url: str) -> Tuple[float, int]:
+        similarities = self.matrix[:self.size] @ embedding
+        # Earlier summaries of the same URL are the exact cache's job, never a near-duplicate
+        for i, entry in enumerate(self.entries):
+            if entry.url == exclude_url:
+                similarities[i] = -np.inf
+        best = int(np.argmax(similarities))
+        return float(similarities[best]), best
+
+def normalize_title(title: str) -> str:
+    """Normalize a page title for comparison"""
+    return WHITESPACE_RE.sub(" ", title).strip().casefold()
+
+def find_similar_summary(embedding: np.ndarray, summary_type: str, title: str, url: str) -> Optional[SemanticEntry]:
+    """Return the most similar other page if it is above the threshold and has the same title"""
+    with semantic_index_lock:
+        index = semantic_index.get(summary_type)
+        if index is None or index.size == 0:
+            return None
+        similarity, best = index.most_similar(embedding, url)
+        entry = index.entries[best]
+        # Pages on one site share navigation text, so similarity alone is not enough
+        if similarity >= SEMANTIC_SIMILARITY_THRESHOLD and normalize_title(entry.title) == normalize_title(title):
+            return entry
+    return None
+
+def add_to_semantic_index(embedding, entry: SemanticEntry, summary_type: str):
+    """Make a summary available to the semantic cache"""
+    row = np.asarray(embedding, dtype=np.float32)
+    with semantic_index_lock:
+        if summary_type in semantic_index:
+            semantic_index[summary_type].add(row, entry)
+        else:
+            semantic_index[summary_type] = SemanticIndex(row[np.newaxis, :].copy(), [entry])
+
+def get_cached_summary(url: str, summary_type: str) -> Optional[SummaryResult]:
+    """Return a previously generated summary if it is still cached"""
+    with summary_cache_lock:
+        return summary_cache.get((url, summary_type))
+
+def cache_summary(url: str, summary_type: str, result: SummaryResult):
+    """Remember a successful summary for repeat requests"""
+    with summary_cache_lock:
+        summary_cache[(url, summary_type)] = result
+
+def summarize_website(url: str, summary_type: str = "short") -> SummaryResult:
     """Main function to summarize a website"""
+    if not api_key:
+        return SummaryResult("❌ **Error**: No Gemini API key found. Please check your .env file.", "Unknown Title")
+
+    if not model:
+        return SummaryResult("❌ **Error**: Failed to initialize Gemini model.", "Unknown Title")
+
+    # Skip both the fetch and the Gemini call on a cache hit
+    cached = get_cached_summary(url, summary_type)
+    if cached:
+        return cached
+
+    # Scrape the website
+    website = Website(url)
+
+    return SummaryResult(summarize_page(website, summary_type), website.title, website.embedding, website.reused_from)
+
+def summarize_page(website: Website, summary_type: str = "short") -> str:
+    """Summarize an already scraped website"""
     if not api_key:
         return "❌ **Error**: No Gemini API key found. Please check your .env file."
 
@@ -78,66 +424,303 @@ def summarize_website(url: str, summary_type: str = "short") -> str:
         return "❌ **Error**: Failed to initialize Gemini model."
 
     try:
-        # Scrape the website
-        website = Website(url)
+        early_summary = prepare_page(website, summary_type)
+    except Exception as e:
+        return f"❌ **Error**: Failed to generate summary: {str(e)}"
+
+    if early_summary is not None:
+        return early_summary
+
+    return generate_page_summary(website, summary_type)
+
+def prepare_page(website: Website, summary_type: str) -> Optional[str]:
+    """Return a summary that needs no Gemini call (an error or a near-duplicate), or None"""
+    if website.error:
+        return f"❌ **Error**: {website.error}"
 
-        if website.error:
-            return f"❌ **Error**: {website.error}"
+    if not website.text.strip():
+        return "❌ **Error**: No content could be extracted from the website."
 
-        if not website.text.strip():
-            return "❌ **Error**: No content could be extracted from the website."
+    # Near-duplicate pages reuse an existing summary instead of calling Gemini
+    ensure_summaries_loaded()
+    embedding = embed_text(website.text[:MAX_TEXT_CHARS])
+    if embedding is not None:
+        website.embedding = embedding.tolist()
+        similar = find_similar_summary(embedding, summary_type, website.title, website.url)
+        if similar:
+            # Shown to the user but not cached or saved as this URL's own summary
+            website.reused_from = similar.url
+            return f"_Reused the summary of a near-identical page: {similar.url}_\n\n{similar.summary}"
 
+    return None
+
+def record_summary(website: Website, summary_type: str, summary: str):
+    """Make a freshly generated summary available to the exact and semantic caches"""
+    if website.embedding is not None:
+        add_to_semantic_index(website.embedding, SemanticEntry(summary, website.title, website.url), summary_type)
+    cache_summary(website.url, summary_type, SummaryResult(summary, website.title, website.embedding))
+
+def generate_page_summary(website: Website, summary_type: str) -> str:
+    """Summarize a single prepared page with its own Gemini call"""
+    try:
         # Create the prompt
-        system_prompt = create_system_prompt(summary_type)
+        summary_model = get_summary_model(summary_type)
 
         user_prompt = f"You are looking at a website titled '{website.title}'\n\n"
         user_prompt += "The contents of this website are as follows; please provide a summary of this website in markdown. "
         user_prompt += "If it includes news or announcements, summarize these too.\n\n"
-        user_prompt += website.text[:8000]  # Limit text length to avoid token limits
+        user_prompt += website.text[:MAX_TEXT_CHARS]  # Limit text length to avoid token limits
 
         # Generate summary using Gemini
-        chat = model.start_chat(history=[])
-        response = chat.send_message(user_prompt)
+        response = generate_with_backoff(summary_model, user_prompt)
 
+        record_summary(website, summary_type, response.text)
         return response.text
 
     except Exception as e:
         return f"❌ **Error**: Failed to generate summary: {str(e)}"
 
-def save_summary(url: str, summary: str, summary_type: str) -> Dict:
+def summarize_group(websites: List[Website], summary_type: str = "short") -> List[str]:
+    """Summarize several pages with one Gemini call, falling back to one call per page"""
+    summaries: List[Optional[str]] = [None] * len(websites)
+    pending = []
+
+    for i, website in enumerate(websites):
+        try:
+            summaries[i] = prepare_page(website, summary_type)
+        except Exception as e:
+            summaries[i] = f"❌ **Error**: Failed to generate summary: {str(e)}"
+        if summaries[i] is None:
+            pending.append(i)
+
+    if len(pending) > 1:
+        try:
+            pages = [websites[i] for i in pending]
+            user_prompt = f"Summarize each of the following {len(pages)} websites. "
+            user_prompt += f"Output exactly {len(pages)} markdown sections, one per website and in the same order, "
+            user_prompt += "separated by a line containing only '---'. Do not use '---' anywhere else. "
+            user_prompt += "If a website includes news or announcements, summarize these too.\n\n"
+            for number, website in enumerate(pages, start=1):
+                user_prompt += f"Website {number} (url={website.url}) titled '{website.title}':\n"
+                user_prompt += website.text[:MAX_TEXT_CHARS] + "\n\n"
+
+            response = generate_with_backoff(get_summary_model(summary_type), user_prompt)
+            sections = [section.strip() for section in response.text.split(GROUP_SEPARATOR)]
+
+            if len(sections) == len(pages) and all(sections):
+                for i, section in zip(pending, sections):
+                    summaries[i] = section
+                    record_summary(websites[i], summary_type, section)
+                pending = []
+            else:
+                print(f"Warning: Grouped summary returned {len(sections)} sections for {len(pages)} websites, summarizing individually")
+        except Exception as e:
+            print(f"Warning: Grouped summary failed, summarizing individually: {e}")
+
+    for i in pending:
+        summaries[i] = generate_page_summary(websites[i], summary_type)
+
+    return summaries
+
+@functools.lru_cache(maxsize=1024)
+def format_timestamp(seconds: int) -> str:
+    """Format whole epoch seconds as a local ISO timestamp"""
+    return datetime.fromtimestamp(seconds).isoformat()
+
+def save_summary(url: str, summary: str, summary_type: str, title: str, embedding: Optional[List[float]] = None) -> Dict:
     """Save a summary to history"""
-    timestamp = datetime.now().isoformat()
+    timestamp = format_timestamp(int(time.time()))
     summary_data = {
         "url": url,
         "summary": summary,
         "summary_type": summary_type,
         "timestamp": timestamp,
-        "title": Website(url).title if not Website(url).error else "Unknown Title"
+        "title": title
     }
+    if embedding is not None:
+        summary_data["embedding"] = embedding
+        summary_data["embedding_version"] = EMBEDDING_VERSION
 
-    summaries_history.append(summary_data)
+    ensure_summaries_loaded()
 
-    # Save to file
-    try:
-        with open(SUMMARIES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(summaries_history, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Warning: Could not save to file: {e}")
+    # The list and the file change under one lock, so compaction always snapshots a consistent history
+    with summaries_file_lock:
+        summaries_history.append(summary_data)
+
+        # Append the new entry to file
+        try:
+            _write_summary(summary_data)
+            if len(summaries_history) > GZIP_THRESHOLD and not os.path.exists(GZIP_SUMMARIES_FILE):
+                _compact_summaries()
+        except Exception as e:
+            print(f"Warning: Could not save to file: {e}")
 
     return summary_data
 
+def _write_summary(summary_data: Dict):
+    """Append a single summary as one JSON line; the caller holds summaries_file_lock"""
+    global summaries_file
+    if summaries_file is None:
+        if os.path.exists(GZIP_SUMMARIES_FILE):
+            # Appending starts a new gzip member, which readers handle transparently
+            summaries_file = gzip.open(GZIP_SUMMARIES_FILE, 'ab', compresslevel=3)
+        else:
+            summaries_file = open(SUMMARIES_FILE, 'ab', buffering=65536)
+    summaries_file.write(orjson.dumps(summary_data) + b"\n")
+
+def flush_summaries():
+    """Flush buffered summaries to disk"""
+    with summaries_file_lock:
+        if summaries_file is not None:
+            summaries_file.flush()
+
+def _close_summaries_file():
+    """Flush and close the append handle; the caller holds summaries_file_lock"""
+    global summaries_file
+    if summaries_file is not None:
+        summaries_file.close()
+        summaries_file = None
+
+def close_summaries_file():
+    """Flush and close the append handle"""
+    with summaries_file_lock:
+        _close_summaries_file()
+
+atexit.register(close_summaries_file)
+
+def _compact_summaries():
+    """Rewrite the history file as a clean snapshot; the caller holds summaries_file_lock"""
+    _close_summaries_file()
+    compress = len(summaries_history) > GZIP_THRESHOLD
+    target, stale = (GZIP_SUMMARIES_FILE, SUMMARIES_FILE) if compress else (SUMMARIES_FILE, GZIP_SUMMARIES_FILE)
+    tmp_file = target + ".tmp"
+    with (gzip.open(tmp_file, 'wb', compresslevel=3) if compress else open(tmp_file, 'wb')) as f:
+        for summary_data in summaries_history:
+            f.write(orjson.dumps(summary_data) + b"\n")
+    os.replace(tmp_file, target)
+    if os.path.exists(stale):
+        os.remove(stale)
+
+def compact_summaries():
+    """Rewrite the history file as a clean snapshot of summaries_history"""
+    with summaries_file_lock:
+        _compact_summaries()
+
 def load_summaries() -> List[Dict]:
     """Load summaries from file"""
-    global summaries_history
+    global summaries_history, summaries_loaded
+    needs_compaction = False
     try:
-        if os.path.exists(SUMMARIES_FILE):
-            with open(SUMMARIES_FILE, 'r', encoding='utf-8') as f:
-                summaries_history = json.load(f)
+        loaded = []
+        compressed = os.path.exists(GZIP_SUMMARIES_FILE)
+        if compressed or os.path.exists(SUMMARIES_FILE):
+            flush_summaries()
+            with (gzip.open(GZIP_SUMMARIES_FILE, 'rb') if compressed else open(SUMMARIES_FILE, 'rb')) as f:
+                try:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            loaded.append(orjson.loads(line))
+                        except orjson.JSONDecodeError:
+                            # Typically a partial line left by an interrupted write
+                            needs_compaction = True
+                except EOFError:
+                    # Truncated gzip member, keep everything read so far
+                    needs_compaction = True
+        elif os.path.exists(LEGACY_SUMMARIES_FILE):
+            # Migrate the old single-document history file
+            with open(LEGACY_SUMMARIES_FILE, 'rb') as f:
+                loaded = orjson.loads(f.read())
+            needs_compaction = True
+        summaries_history = loaded
     except Exception as e:
         print(f"Warning: Could not load summaries: {e}")
         summaries_history = []
+        needs_compaction = False
+
+    if needs_compaction:
+        try:
+            compact_summaries()
+        except Exception as e:
+            print(f"Warning: Could not compact summaries: {e}")
+
+    summaries_loaded = True
+    rebuild_semantic_index()
+    return summaries_history
+
+def ensure_summaries_loaded() -> List[Dict]:
+    """Load summaries from file the first time they are needed"""
+    with summaries_load_lock:
+        if not summaries_loaded:
+            load_summaries()
     return summaries_history
 
+def rebuild_semantic_index():
+    """Rebuild the semantic cache from the embeddings stored in history"""
+    grouped: Dict[str, Tuple[List[List[float]], List[SemanticEntry]]] = {}
+    for entry in summaries_history:
+        if entry.get("embedding") and entry.get("embedding_version") == EMBEDDING_VERSION:
+            embeddings, entries = grouped.setdefault(entry["summary_type"], ([], []))
+            embeddings.append(entry["embedding"])
+            entries.append(SemanticEntry(entry["summary"], entry["title"], entry["url"]))
+
+    # Build each matrix in one go rather than appending row by row
+    rebuilt = {
+        summary_type: SemanticIndex(np.asarray(embeddings, dtype=np.float32), entries)
+        for summary_type, (embeddings, entries) in grouped.items()
+    }
+    with semantic_index_lock:
+        semantic_index.clear()
+        semantic_index.update(rebuilt)
+
+async def summarize_all(urls: List[str], summary_type: str = "short", progress=None) -> List[SummaryResult]:
+    """Fetch and summarize multiple websites concurrently, a few pages per Gemini call"""
+    fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    gemini_limit = asyncio.Semaphore(GEMINI_MAX_CONCURRENT_REQUESTS)
+    timeout = aiohttp.ClientTimeout(total=10)
+    completed = 0
+
+    async def process_group(session: aiohttp.ClientSession, group: List[str]) -> List[SummaryResult]:
+        nonlocal completed
+        fetched = await asyncio.gather(
+            *[fetch_website(session, fetch_semaphore, url) for url in group],
+            return_exceptions=True
+        )
+        # One bad URL must not take down the rest of its group
+        websites = [
+            Website.from_error(url, f"Failed to fetch website: {type(result).__name__}: {result}")
+            if isinstance(result, BaseException) else result
+            for url, result in zip(group, fetched)
+        ]
+
+        # Gemini calls block, so run them on worker threads while other pages download
+        async with gemini_limit:
+            summaries = await asyncio.to_thread(summarize_group, websites, summary_type)
+
+        completed += len(group)
+        if progress:
+            progress(completed / len(urls), f"Processed {completed}/{len(urls)} URLs")
+        return [
+            SummaryResult(summary, website.title, website.embedding, website.reused_from)
+            for summary, website in zip(summaries, websites)
+        ]
+
+    groups = [urls[i:i + BATCH_GROUP_SIZE] for i in range(0, len(urls), BATCH_GROUP_SIZE)]
+    async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+        group_results = await asyncio.gather(
+            *[process_group(session, group) for group in groups],
+            return_exceptions=True
+        )
+
+    results = []
+    for group, group_result in zip(groups, group_results):
+        if isinstance(group_result, BaseException):
+            results.extend(SummaryResult(f"❌ **Error**: {str(group_result)}", "Error") for _ in group)
+        else:
+            results.extend(group_result)
+    return results
+
 def summarize_multiple(urls_text: str, summary_type: str = "short", progress=gr.Progress()) -> str:
     """Summarize multiple URLs"""
     if not api_key:
@@ -150,55 +733,83 @@ def summarize_multiple(urls_text: str, summary_type: str = "short", progress=gr.
     if not urls:
         return "❌ **Error**: No valid URLs found."
 
+    # Drop repeated URLs, keeping the first occurrence
+    seen = set()
+    urls = [url for url in urls if not (url in seen or seen.add(url))]
+
     results = []
-    total_urls = len(urls)
 
-    for i, url in enumerate(urls):
-        progress((i) / total_urls, f"Processing {i+1}/{total_urls}: {url}")
+    # Summaries already in history for this type are reused without saving them again
+    previous = {
+        entry["url"]: SummaryResult(entry["summary"], entry["title"], entry.get("embedding"))
+        for entry in ensure_summaries_loaded()
+        if entry["summary_type"] == summary_type
+    }
+
+    # Reuse cached summaries and only process the pages we still need
+    cached = {url: previous.get(url) or get_cached_summary(url, summary_type) for url in urls}
+    to_process = [url for url in urls if cached[url] is None]
+
+    # Fetch and summarize all remaining pages concurrently
+    progress(0, f"Processing {len(to_process)} URLs...")
+    summarized = dict(zip(to_process, asyncio.run(summarize_all(to_process, summary_type, progress)))) if to_process else {}
+
+    for url in urls:
+        result = cached[url] or summarized[url]
 
         try:
-            summary = summarize_website(url, summary_type)
-            if not summary.startswith("❌"):
-                save_summary(url, summary, summary_type)
-                results.append(f"## {Website(url).title}\n**URL:** {url}\n\n{summary}\n")
+            if not result.summary.startswith("❌"):
+                if url not in previous and not result.reused_from:
+                    save_summary(url, result.summary, summary_type, result.title, result.embedding)
+                results.append(f"## {result.title}\n**URL:** {url}\n\n{result.summary}\n")
             else:
-                results.append(f"## ❌ {Website(url).title}\n**URL:** {url}\n\n{summary}\n")
-
-            # Small delay to avoid rate limits
-            time.sleep(1)
+                results.append(f"## ❌ {result.title}\n**URL:** {url}\n\n{result.summary}\n")
 
         except Exception as e:
             results.append(f"## ❌ Error\n**URL:** {url}\n\n❌ **Error**: {str(e)}\n")
 
-        progress((i + 1) / total_urls)
-
+    flush_summaries()
     return "\n---\n".join(results)
 
+EXPORT_MARKDOWN_TEMPLATE = (
+    "## {title}\n"
+    "**URL:** {url}\n"
+    "**Summary Type:** {summary_type}\n"
+    "**Date:** {timestamp}\n\n"
+    "{summary}\n\n---\n\n"
+)
+
+EXPORT_TXT_TEMPLATE = (
+    "Title: {title}\n"
+    "URL: {url}\n"
+    "Type: {summary_type}\n"
+    "Date: {timestamp}\n"
+    "Summary:\n{summary}\n\n" + "=" * 50 + "\n\n"
+)
+
 def export_summaries(format_type: str = "markdown") -> str:
     """Export all summaries in different formats"""
+    ensure_summaries_loaded()
     if not summaries_history:
         return "❌ **Error**: No summaries to export."
 
     if format_type == "markdown":
-        output = "# Website Summaries Export\n\n"
-        for summary in summaries_history:
-            output += f"## {summary['title']}\n"
-            output += f"**URL:** {summary['url']}\n"
-            output += f"**Summary Type:** {summary['summary_type']}\n"
-            output += f"**Date:** {summary['timestamp']}\n\n"
-            output += f"{summary['summary']}\n\n---\n\n"
+        output = "# Website Summaries Export\n\n" + "".join(
+            EXPORT_MARKDOWN_TEMPLATE.format(**summary) for summary in summaries_history
+        )
 
     elif format_type == "json":
-        output = json.dumps(summaries_history, indent=2, ensure_ascii=False)
+        # Embeddings are only used internally by the semantic cache
+        exported = [
+            {k: v for k, v in summary.items() if k not in ("embedding", "embedding_version")}
+            for summary in summaries_history
+        ]
+        output = orjson.dumps(exported, option=orjson.OPT_INDENT_2).decode('utf-8')
 
     elif format_type == "txt":
-        output = "WEBSITE SUMMARIES EXPORT\n\n"
-        for summary in summaries_history:
-            output += f"Title: {summary['title']}\n"
-            output += f"URL: {summary['url']}\n"
-            output += f"Type: {summary['summary_type']}\n"
-            output += f"Date: {summary['timestamp']}\n"
-            output += f"Summary:\n{summary['summary']}\n\n{'='*50}\n\n"
+        output = "WEBSITE SUMMARIES EXPORT\n\n" + "".join(
+            EXPORT_TXT_TEMPLATE.format(**summary) for summary in summaries_history
+        )
 
     return output
 
@@ -232,9 +843,6 @@ def create_ui():
         """
     ) as app:
 
-        # Load existing summaries on startup
-        load_summaries()
-
         # Header
         gr.HTML("""
         <div class="title">🌐 Website Summarizer</div>
@@ -310,7 +918,7 @@ def create_ui():
                 )
 
             # History & Export Tab
-            with gr.Tab("📋 History & Export"):
+            with gr.Tab("📋 History & Export") as history_tab:
                 with gr.Row():
                     with gr.Column():
                         export_format = gr.Dropdown(
@@ -332,8 +940,7 @@ def create_ui():
 
                     with gr.Column():
                         history_info = gr.Markdown(
-                            value=f"**Total Summaries:** {len(summaries_history)}\n\n"
-                            "Summaries are automatically saved to history when generated."
+                            value="Summaries are automatically saved to history when generated."
                         )
 
                 export_output = gr.Textbox(
@@ -349,29 +956,39 @@ def create_ui():
         )
 
         # Event handlers
-        def process_single_summary(url, summary_type_value):
+        def summarize_and_save(url, summary_type_value):
+            result = summarize_website(url, summary_type_value)
+
+            if not result.summary.startswith("❌") and not result.reused_from:
+                # Save successful summary
+                save_summary(url, result.summary, summary_type_value, result.title, result.embedding)
+                flush_summaries()
+
+            return result.summary
+
+        async def process_single_summary(url, summary_type_value):
             if not url.strip():
                 return "❌ Please enter a valid URL"
 
             try:
-                result = summarize_website(url, summary_type_value)
-
-                if not result.startswith("❌"):
-                    # Save successful summary
-                    save_summary(url, result, summary_type_value)
-                    # Update history info
-                    return result
-                else:
-                    return result
+                # Saving does file I/O (and may compact history), so it runs off the event loop too
+                return await asyncio.to_thread(summarize_and_save, url, summary_type_value)
 
             except Exception as e:
                 return f"❌ **Error**: {str(e)}"
 
-        def process_batch_summary(urls_text, summary_type_value, progress=gr.Progress()):
-            return summarize_multiple(urls_text, summary_type_value, progress)
+        async def process_batch_summary(urls_text, summary_type_value, progress=gr.Progress()):
+            # summarize_multiple runs its own event loop, so keep it off Gradio's
+            return await asyncio.to_thread(summarize_multiple, urls_text, summary_type_value, progress)
+
+        def show_history_info():
+            # History is loaded on first visit to this tab rather than at startup
+            ensure_summaries_loaded()
+            return f"**Total Summaries:** {len(summaries_history)}\n\nSummaries are automatically saved to history when generated."
 
         def export_data(format_type):
             global summaries_history
+            ensure_summaries_loaded()
             if not summaries_history:
                 return "❌ **Error**: No summaries to export."
 
@@ -381,11 +998,17 @@ def create_ui():
             return export_summaries(format_type)
 
         def clear_history():
-            global summaries_history
+            global summaries_history, summaries_loaded
             summaries_history = []
+            summaries_loaded = True
+            with summary_cache_lock:
+                summary_cache.clear()
+            rebuild_semantic_index()
+            close_summaries_file()
             try:
-                if os.path.exists(SUMMARIES_FILE):
-                    os.remove(SUMMARIES_FILE)
+                for path in (SUMMARIES_FILE, GZIP_SUMMARIES_FILE, LEGACY_SUMMARIES_FILE):
+                    if os.path.exists(path):
+                        os.remove(path)
             except Exception as e:
                 pass
 
@@ -401,6 +1024,12 @@ def create_ui():
             return ""
 
         # Connect events
+        history_tab.select(
+            show_history_info,
+            inputs=[],
+            outputs=[history_info]
+        )
+
         summarize_btn.click(
             process_single_summary,
             inputs=[url_input, summary_type],
@@ -443,6 +1072,7 @@ def create_ui():
 # Launch the app
 if __name__ == "__main__":
     app = create_ui()
+    app.queue(default_concurrency_limit=8, max_size=64)
     app.launch(
         server_name="0.0.0.0",
         server_port=7860,